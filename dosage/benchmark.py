@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# dosage/benchmark.py
+#
+# Verwendung: python -m dosage.benchmark [wiederholungen]
+#
+# Vergleicht das Rendern aller Sprachen mit je einer eigenen Analyse pro
+# Sprache gegen eine gemeinsame Analyse mit anschließenden Formatierungsdurchläufen.
+
+import sys
+import timeit
+
+from dosage.builder import (
+    build_interval, build_interval_with_times, build_mman,
+    build_timeofday, build_weekday, build_weekday_based
+)
+from dosage.locales import SUPPORTED_LOCALES
+from dosage.text_generator import GematikDosageTextGenerator
+
+
+def sample_dosages() -> list:
+    resources = [
+        build_mman((1, "1"), (0, None), (2, "1"), (1, "7"), 10, "Ibuprofen 400mg", "d"),
+        build_timeofday(["08:00", "12:30", "20:00"], [1, 1, 2], ["1", "1", "6"], 2, "Arzneimittel", "wk"),
+        build_weekday([("mon", 1, "1"), ("wed", 1, "1"), ("fri", 2, "5")], None, None, "Arzneimittel"),
+        build_interval(3, 1, "d", 7, "d", "Arzneimittel", 1, "1"),
+        build_interval(1, 8, "h", None, None, "Arzneimittel", 0.5, "6"),
+        build_interval_with_times([("MORN", 1), ("21:00", 2)], 2, "d", 1, "Arzneimittel", "1", "mo"),
+        build_weekday_based(
+            [{"days": ["mon", "thu"], "time": "07:00:00", "dose": 1}, {"days": ["sun"], "when": "NIGHT"}],
+            3, "Arzneimittel", "8", "wk",
+        ),
+    ]
+    return [dosage for resource in resources for dosage in resource["dosageInstruction"]]
+
+
+def run(number: int = 2000) -> dict:
+    generator = GematikDosageTextGenerator()
+    dosages = sample_dosages()
+
+    def per_locale():
+        for dosage in dosages:
+            for locale in SUPPORTED_LOCALES:
+                generator.generate_single_dosage_text(dosage, locale)
+
+    def shared_analysis():
+        for dosage in dosages:
+            generator.generate_localized_texts(dosage, SUPPORTED_LOCALES)
+
+    def analysis_only():
+        for dosage in dosages:
+            generator.analyze(dosage)
+
+    return {
+        name: timeit.timeit(func, number=number)
+        for name, func in [
+            ("analyse", analysis_only),
+            ("je Sprache analysiert", per_locale),
+            ("gemeinsame Analyse", shared_analysis),
+        ]
+    }
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    calls = number * len(sample_dosages())
+    print(f"{calls} Dosierungen x {len(SUPPORTED_LOCALES)} Sprachen ({', '.join(SUPPORTED_LOCALES)})")
+    for name, seconds in run(number).items():
+        print(f"{name:<24} {seconds:8.3f} s  {seconds / calls * 1e6:8.2f} µs/Dosierung")
+
+
+if __name__ == "__main__":
+    main()
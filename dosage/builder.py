@@ -1,21 +1,26 @@
 from typing import List, Tuple, Optional
 from collections import defaultdict
 
-from dosage.dosage_units import resolve_unit_label
+from dosage.dosage_units import (
+    KBV_DOSE_UNIT_SYSTEM, UCUM_SYSTEM, DosageUnitRegistry, get_dosage_unit_registry
+)
+
+MEDICATION_REQUEST_PROFILE = "http://ig.fhir.de/igs/medication/StructureDefinition/MedicationRequestDgMP"
+DURATION_UNIT_LABELS = {
+    "d": "Tag(e)",
+    "wk": "Woche(n)",
+    "mo": "Monat(e)",
+    "a": "Jahr(e)",
+}
 
 
 def bounds_duration(value: Optional[int], unit: Optional[str]) -> dict:
-    if value and unit and unit in {"d", "wk", "mo", "a"}:
+    if value and unit and unit in DURATION_UNIT_LABELS:
         return {
             "boundsDuration": {
                 "value": value,
-                "unit": {
-                    "d": "Tag(e)",
-                    "wk": "Woche(n)",
-                    "mo": "Monat(e)",
-                    "a": "Jahr(e)",
-                }[unit],
-                "system": "http://unitsofmeasure.org",
+                "unit": DURATION_UNIT_LABELS[unit],
+                "system": UCUM_SYSTEM,
                 "code": unit,
             }
         }
@@ -23,23 +28,9 @@ def bounds_duration(value: Optional[int], unit: Optional[str]) -> dict:
 
 
 def build_freetext(text: str) -> dict:
-    return {
-        "resourceType": "MedicationRequest",
-        "meta": {
-            "profile": [
-                "http://ig.fhir.de/igs/medication/StructureDefinition/MedicationRequestDgMP"
-            ]
-        },
-        "status": "active",
-        "intent": "order",
-        "medicationCodeableConcept": {"text": "Ibuprofen 400mg"},
-        "subject": {"display": "Patient"},
-        "dosageInstruction": [
-            {
-                "text": text,
-            }
-        ],
-    }
+    resource = _base_resource("Ibuprofen 400mg")
+    resource["dosageInstruction"].append({"text": text})
+    return resource
 
 
 def build_timeofday(
@@ -49,6 +40,7 @@ def build_timeofday(
     duration_value: Optional[int],
     medication: str,
     duration_unit: Optional[str],
+    registry: Optional[DosageUnitRegistry] = None,
 ) -> dict:
     if not (len(times) == len(doses) == len(units)):
         raise ValueError("Uhrzeiten, Dosen und Einheiten müssen gleich lang sein.")
@@ -64,7 +56,7 @@ def build_timeofday(
     for (dose, unit), times in grouped.items():
         dosage = {
             "timing": {"repeat": {"timeOfDay": times, **bounds}},
-            "doseAndRate": [_dose_quantity(dose, unit)],
+            "doseAndRate": [_dose_quantity(dose, unit, registry)],
         }
         resource["dosageInstruction"].append(dosage)
 
@@ -79,6 +71,7 @@ def build_mman(
     duration_value: Optional[int],
     medication: str,
     duration_unit: Optional[str],
+    registry: Optional[DosageUnitRegistry] = None,
 ) -> dict:
     time_slots = {"MORN": morning, "NOON": noon, "EVE": evening, "NIGHT": night}
     resource = _base_resource(medication)
@@ -96,7 +89,7 @@ def build_mman(
     for (dose, unit), whens in dose_groups.items():
         dosage = {
             "timing": {"repeat": {"when": whens, **bounds}},
-            "doseAndRate": [_dose_quantity(dose, unit)],
+            "doseAndRate": [_dose_quantity(dose, unit, registry)],
         }
         resource["dosageInstruction"].append(dosage)
 
@@ -107,7 +100,8 @@ def build_weekday(
     days_and_doses: List[Tuple[str, float, Optional[str]]],
     duration_value: Optional[int],
     duration_unit: Optional[str],
-    medication: str
+    medication: str,
+    registry: Optional[DosageUnitRegistry] = None,
 ) -> dict:
     resource = _base_resource(medication)
     bounds = bounds_duration(duration_value, duration_unit)
@@ -127,7 +121,7 @@ def build_weekday(
                     **bounds
                 }
             },
-            "doseAndRate": [_dose_quantity(dose, unit)]
+            "doseAndRate": [_dose_quantity(dose, unit, registry)]
         }
         resource["dosageInstruction"].append(dosage)
 
@@ -144,6 +138,7 @@ def build_interval(
     medication: str,
     dose: float,
     unit: str,
+    registry: Optional[DosageUnitRegistry] = None,
 ) -> dict:
     resource = _base_resource(medication)
     bounds = bounds_duration(duration_value, duration_unit)
@@ -156,7 +151,7 @@ def build_interval(
                 **bounds,
             }
         },
-        "doseAndRate": [_dose_quantity(dose, unit)],
+        "doseAndRate": [_dose_quantity(dose, unit, registry)],
     }
     resource["dosageInstruction"].append(dosage)
     return resource
@@ -170,6 +165,7 @@ def build_interval_with_times(
     medication: str,
     unit: str,
     duration_unit: Optional[str],
+    registry: Optional[DosageUnitRegistry] = None,
 ) -> dict:
     resource = _base_resource(medication)
     bounds = bounds_duration(duration_value, duration_unit)
@@ -186,7 +182,7 @@ def build_interval_with_times(
                     **bounds,
                 }
             },
-            "doseAndRate": [_dose_quantity(dose, unit)],
+            "doseAndRate": [_dose_quantity(dose, unit, registry)],
         }
         resource["dosageInstruction"].append(dosage)
 
@@ -199,6 +195,7 @@ def build_weekday_based(
     medication: str,
     unit: str,
     duration_unit: Optional[str],
+    registry: Optional[DosageUnitRegistry] = None,
 ) -> dict:
     resource = _base_resource(medication)
     bounds = bounds_duration(duration_value, duration_unit)
@@ -222,7 +219,7 @@ def build_weekday_based(
 
         dosage = {
             "timing": {"repeat": repeat},
-            "doseAndRate": [_dose_quantity(dose, unit)],
+            "doseAndRate": [_dose_quantity(dose, unit, registry)],
         }
         resource["dosageInstruction"].append(dosage)
 
@@ -232,11 +229,7 @@ def build_weekday_based(
 def _base_resource(medication: str) -> dict:
     return {
         "resourceType": "MedicationRequest",
-        "meta": {
-            "profile": [
-                "http://ig.fhir.de/igs/medication/StructureDefinition/MedicationRequestDgMP"
-            ]
-        },
+        "meta": {"profile": [MEDICATION_REQUEST_PROFILE]},
         "status": "active",
         "intent": "order",
         "medicationCodeableConcept": {"text": medication},
@@ -245,12 +238,12 @@ def _base_resource(medication: str) -> dict:
     }
 
 
-def _dose_quantity(value: float, unit_code: Optional[str]) -> dict:
+def _dose_quantity(value: float, unit_code: Optional[str], registry: Optional[DosageUnitRegistry] = None) -> dict:
     return {
         "doseQuantity": {
             "value": value,
-            "unit": resolve_unit_label(unit_code),
-            "system": "https://fhir.kbv.de/CodeSystem/KBV_CS_SFHIR_BMP_DOSIEREINHEIT",
+            "unit": (registry or get_dosage_unit_registry()).resolve(unit_code),
+            "system": KBV_DOSE_UNIT_SYSTEM,
             "code": unit_code or "1",
         }
     }
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# dosage/conformance.py
+#
+# Verwendung:
+#   python -m dosage.conformance generate [--corpus PFAD]             Golden-Korpus neu erzeugen
+#   python -m dosage.conformance check [--corpus PFAD] [--impl M:K]   Byte-genauer Abgleich mit Zeitmessung
+#   python -m dosage.conformance fuzz --impl M:K                      Zufallsvergleich gegen die Referenz
+#
+# Referenz ist GematikDosageTextGenerator. Alternative (schnellere)
+# Implementierungen werden als "modul:attribut" angegeben und müssen
+# generate_single_dosage_text(dosage, locale) bereitstellen.
+
+import argparse
+import copy
+import importlib
+import itertools
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from dosage.builder import (
+    build_freetext, build_interval, build_interval_with_times, build_mman,
+    build_timeofday, build_weekday, build_weekday_based
+)
+from dosage.dosage_units import resolve_unit_label
+from dosage.locales import SUPPORTED_LOCALES
+from dosage.text_generator import (
+    DENY_DOSAGE_FIELDS, DENY_DOSE_AND_RATE_SUBFIELDS, DENY_TIMING_FIELDS,
+    DENY_TIMING_REPEAT_FIELDS, GematikDosageTextGenerator
+)
+
+CORPUS_FILE = Path(__file__).parent / "golden_corpus.jsonl"
+
+DURATIONS = [(None, None), (5, "d"), (2, "wk"), (1, "mo"), (1, "a")]
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+WHEN_CODES = ["MORN", "NOON", "AFT", "EVE", "NIGHT"]
+UNIT_CODES = ["1", "6", "5", "7", "p", "t"]
+
+
+# Korpus aus den Buildern
+
+def _builder_cases() -> Iterator[Tuple[str, dict]]:
+    for text in ["1-0-1", "bei Bedarf 1 Tablette", "Täglich 2x 5 ml"]:
+        yield "build_freetext", build_freetext(text)
+
+    for doses in itertools.product([0, 1, 2, 0.5], repeat=4):
+        if not any(doses):
+            continue
+        for variant, (duration_value, duration_unit) in enumerate(DURATIONS):
+            slots = [(dose, UNIT_CODES[(slot + variant) % 2]) for slot, dose in enumerate(doses)]
+            yield "build_mman", build_mman(*slots, duration_value, "Arzneimittel", duration_unit)
+
+    times = ["06:00", "08:00", "12:30", "18:00", "22:00:00"]
+    for size in range(1, len(times) + 1):
+        for subset in itertools.combinations(times, size):
+            for dose, unit, (duration_value, duration_unit) in itertools.product(
+                [1, 2, 0.5], UNIT_CODES[:3], DURATIONS
+            ):
+                yield "build_timeofday", build_timeofday(
+                    list(subset), [dose] * size, [unit] * size, duration_value, "Arzneimittel", duration_unit
+                )
+
+    for size in range(1, len(DAYS) + 1):
+        for subset in itertools.combinations(DAYS, size):
+            for dose, (duration_value, duration_unit) in itertools.product([1, 2], DURATIONS):
+                entries = [(day, dose, UNIT_CODES[size % len(UNIT_CODES)]) for day in subset]
+                yield "build_weekday", build_weekday(entries, duration_value, duration_unit, "Arzneimittel")
+
+    for frequency, period, period_unit in itertools.product(
+        [1, 2, 3], [1, 2, 8], ["s", "min", "h", "d", "wk", "mo", "a"]
+    ):
+        for duration_value, duration_unit in DURATIONS:
+            yield "build_interval", build_interval(
+                frequency, period, period_unit, duration_value, duration_unit,
+                "Arzneimittel", frequency * 0.5, UNIT_CODES[period % len(UNIT_CODES)]
+            )
+
+    slots = ["MORN", "NOON", "EVE", "NIGHT", "07:00", "13:00:00", "21:30"]
+    for slot, (period, period_unit), dose, (duration_value, duration_unit) in itertools.product(
+        slots, [(1, "d"), (2, "d"), (3, "d"), (1, "wk"), (8, "h")], [1, 2], DURATIONS[:3]
+    ):
+        yield "build_interval_with_times", build_interval_with_times(
+            [(slot, dose)], period, period_unit, duration_value, "Arzneimittel", "1", duration_unit
+        )
+
+    for size in range(1, 4):
+        for subset in itertools.combinations(DAYS, size):
+            for extra, (duration_value, duration_unit) in itertools.product(
+                [{"time": "08:00:00"}, {"when": "EVE"}, {}], DURATIONS[:2]
+            ):
+                entries = [{"days": list(subset), "dose": 1, **extra}]
+                yield "build_weekday_based", build_weekday_based(
+                    entries, duration_value, "Arzneimittel", "6", duration_unit
+                )
+
+
+# Handgeschriebene Grenzfälle
+
+def _edge_cases() -> Iterator[Tuple[str, dict]]:
+    dose = {"doseQuantity": {"value": 1, "unit": "Stück", "code": "1"}}
+    repeat = {"frequency": 1, "period": 1, "periodUnit": "d"}
+
+    for field in sorted(DENY_DOSAGE_FIELDS):
+        yield "unsupported", {field: True, "timing": {"repeat": dict(repeat)}, "doseAndRate": [dose]}
+    for field in sorted(DENY_DOSE_AND_RATE_SUBFIELDS):
+        yield "unsupported", {"timing": {"repeat": dict(repeat)}, "doseAndRate": [{field: {}}]}
+    for field in sorted(DENY_TIMING_FIELDS):
+        yield "unsupported", {"timing": {field: [], "repeat": dict(repeat)}, "doseAndRate": [dose]}
+    for field in sorted(DENY_TIMING_REPEAT_FIELDS):
+        yield "unsupported", {"timing": {"repeat": {**repeat, field: 1}}, "doseAndRate": [dose]}
+    yield "unsupported", {
+        "route": {}, "method": {}, "timing": {"event": [], "repeat": {"count": 3, "offset": 30}},
+        "doseAndRate": [{"doseRange": {}, "rateRatio": {}}],
+    }
+
+    yield "text", {"text": "1-0-1", "timing": {"repeat": dict(repeat)}, "doseAndRate": [dose]}
+    yield "text", {"text": "", "timing": {"repeat": dict(repeat)}, "doseAndRate": [dose]}
+    yield "text", {"text": "frei", "route": {}}
+
+    for when in [["AFT"], ["AFT", "MORN"], ["NIGHT", "AFT", "EVE", "NOON", "MORN"], ["morn", "EVE"], ["PC"]]:
+        yield "when", {"timing": {"repeat": {**repeat, "when": when}}, "doseAndRate": [dose]}
+
+    for time_of_day in ["8", "8:5", "08:00:00", "24:00", "ab:cd", "", " 9:00", "7:30:15", "12:"]:
+        yield "format_time", {"timing": {"repeat": {"timeOfDay": [time_of_day]}}, "doseAndRate": [dose]}
+    yield "format_time", {"timing": {"repeat": {"timeOfDay": ["20:00", "8:00", "08:00:00"]}}}
+
+    yield "days", {"timing": {"repeat": {"dayOfWeek": ["SUN", "Mon", "xyz"]}}, "doseAndRate": [dose]}
+    yield "frequency", {"timing": {"repeat": {"frequency": 2}}}
+    yield "frequency", {"timing": {"repeat": {"period": 1, "periodUnit": "d"}}}
+    yield "frequency", {"timing": {"repeat": {"frequency": 2, "period": 1.0, "periodUnit": "wk"}}}
+    yield "frequency", {"timing": {"repeat": {"frequency": 1, "period": 3, "periodUnit": "x"}}}
+    yield "bounds", {"timing": {"repeat": {"boundsDuration": {"value": 3}}}}
+    yield "bounds", {"timing": {"repeat": {"boundsDuration": {"value": 2, "code": "wk"}}}}
+    yield "quantity", {"doseAndRate": [{"doseQuantity": {"value": 2.5, "code": "g"}}]}
+    yield "bounds", {"timing": {"repeat": {"boundsDuration": {"value": 3, "unit": "Dosen", "code": "xyz"}}}}
+    yield "quantity", {"doseAndRate": [{"doseQuantity": {}}]}
+    yield "quantity", {"doseAndRate": [{}]}
+    yield "quantity", {"doseAndRate": [{"doseQuantity": {
+        "value": 1, "unit": "Stück", "code": "Stück",
+        "system": "https://fhir.kbv.de/CodeSystem/KBV_CS_SFHIR_BMP_DOSIEREINHEIT",
+    }}]}
+    yield "quantity", {"doseAndRate": [{"doseQuantity": {"value": 5, "unit": "mg", "code": "mg", "system": "other"}}]}
+    # Bezeichnung und KBV-Code widersprechen sich bzw. stimmen überein
+    yield "quantity", {"doseAndRate": [{"doseQuantity": {
+        "value": 2.5, "unit": "g", "code": "g",
+        "system": "https://fhir.kbv.de/CodeSystem/KBV_CS_SFHIR_BMP_DOSIEREINHEIT",
+    }}]}
+    yield "quantity", {"doseAndRate": [{"doseQuantity": {
+        "value": 2.5, "unit": "Einzeldosis", "code": "g",
+        "system": "https://fhir.kbv.de/CodeSystem/KBV_CS_SFHIR_BMP_DOSIEREINHEIT",
+    }}]}
+    yield "quantity", {"doseAndRate": [{"doseQuantity": {"value": 2.5, "unit": "g", "code": "g"}}]}
+    yield "quantity", {"doseAndRate": [{"doseQuantity": {"value": 1, "unit": "Stück", "code": "6"}}]}
+    yield "bounds", {"timing": {"repeat": {"boundsDuration": {
+        "value": 1, "unit": "Jahr(e)", "system": "http://unitsofmeasure.org", "code": "a",
+    }}}}
+    yield "empty", {}
+    yield "empty", {"timing": {}}
+    yield "empty", {"timing": {"repeat": {}}, "doseAndRate": []}
+
+
+def build_corpus(reference=None) -> List[dict]:
+    reference = reference or GematikDosageTextGenerator()
+    corpus = []
+    counters = {}
+    seen = set()
+    sources = itertools.chain(
+        ((source, dosage) for source, resource in _builder_cases() for dosage in resource["dosageInstruction"]),
+        _edge_cases(),
+    )
+    for source, dosage in sources:
+        # Builder liefern dieselbe Dosierung oft mehrfach; jede nur einmal aufnehmen
+        key = json.dumps(dosage, sort_keys=True)
+        if key in seen:
+            continue
+        seen.add(key)
+        counters[source] = counters.get(source, 0) + 1
+        corpus.append({
+            "id": f"{source}-{counters[source]:04d}",
+            "dosage": dosage,
+            "expected": {locale: render(reference, dosage, locale) for locale in SUPPORTED_LOCALES},
+        })
+    return corpus
+
+
+def write_corpus(corpus: List[dict], path: Path = CORPUS_FILE):
+    with open(path, "w", encoding="utf-8") as file:
+        for case in corpus:
+            file.write(json.dumps(case, ensure_ascii=False) + "\n")
+
+
+def load_corpus(path: Path = CORPUS_FILE) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+# Abgleich
+
+def load_implementation(spec: Optional[str]):
+    if not spec:
+        return GematikDosageTextGenerator()
+    module_name, _, attribute = spec.partition(":")
+    implementation = getattr(importlib.import_module(module_name), attribute or "GematikDosageTextGenerator")
+    return implementation() if isinstance(implementation, type) else implementation
+
+
+def render(implementation, dosage: dict, locale: str) -> str:
+    # Nur ValueError gehört zum erwarteten Verhalten (z. B. fehlende
+    # Übersetzungen); jeder andere Fehler lässt generate/check abbrechen.
+    try:
+        return implementation.generate_single_dosage_text(dosage, locale)
+    except ValueError as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def check_corpus(corpus: List[dict], implementation=None, repeat: int = 1) -> List[dict]:
+    implementation = implementation or GematikDosageTextGenerator()
+    results = []
+    for case in corpus:
+        for locale, expected in case["expected"].items():
+            best = None
+            for _ in range(repeat):
+                dosage = copy.deepcopy(case["dosage"])
+                start = time.perf_counter_ns()
+                actual = render(implementation, dosage, locale)
+                elapsed = time.perf_counter_ns() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results.append({
+                "id": case["id"],
+                "locale": locale,
+                "ok": actual == expected,
+                "expected": expected,
+                "actual": actual,
+                "ns": best,
+            })
+    return results
+
+
+# Fuzzing
+
+def random_dosage(rnd: random.Random) -> dict:
+    def pick(*values):
+        return rnd.choice(values)
+
+    dosage = {}
+    if rnd.random() < 0.05:
+        dosage[pick(*sorted(DENY_DOSAGE_FIELDS))] = True
+    if rnd.random() < 0.05:
+        dosage["text"] = pick("", "1-0-1")
+
+    repeat = {}
+    if rnd.random() < 0.8:
+        for key in ("frequency", "period"):
+            if rnd.random() < 0.8:
+                repeat[key] = pick(1, 2, 3, 8, 1.0, 0, None)
+        if rnd.random() < 0.8:
+            repeat["periodUnit"] = pick("s", "min", "h", "d", "wk", "mo", "a", "x", None)
+    if rnd.random() < 0.4:
+        repeat["dayOfWeek"] = rnd.sample(DAYS + ["MON", "Sun", "xyz"], rnd.randint(0, 5))
+    if rnd.random() < 0.4:
+        repeat["timeOfDay"] = rnd.sample(
+            ["08:00", "8:00:00", "12", "ab:cd", "20:30:00", "7:5", "", "23:59"], rnd.randint(0, 3)
+        )
+    if rnd.random() < 0.4:
+        repeat["when"] = rnd.sample(WHEN_CODES + ["morn", "PC"], rnd.randint(0, 4))
+    if rnd.random() < 0.3:
+        value, unit = pick(*DURATIONS[1:])
+        repeat["boundsDuration"] = pick(
+            {"value": value, "unit": "Tag(e)", "system": "http://unitsofmeasure.org", "code": unit},
+            {"value": value, "code": unit},
+            {"value": 0},
+            {},
+        )
+    if rnd.random() < 0.03:
+        repeat[pick(*sorted(DENY_TIMING_REPEAT_FIELDS))] = 1
+
+    timing = {}
+    if repeat or rnd.random() < 0.5:
+        timing["repeat"] = repeat
+    if rnd.random() < 0.02:
+        timing["event"] = []
+    dosage["timing"] = timing
+
+    if rnd.random() < 0.8:
+        code = pick(*UNIT_CODES)
+        dosage["doseAndRate"] = [pick(
+            {"doseQuantity": {
+                "value": pick(1, 2, 0.5), "unit": pick(resolve_unit_label(code), "Stück"), "code": code,
+                "system": "https://fhir.kbv.de/CodeSystem/KBV_CS_SFHIR_BMP_DOSIEREINHEIT",
+            }},
+            {"doseQuantity": {"value": 2.5, "code": "g"}},
+            {"doseQuantity": {}},
+            {"doseRange": {}},
+            {},
+        )]
+    return dosage
+
+
+def _outcome(implementation, dosage: dict, locale: str) -> str:
+    try:
+        return implementation.generate_single_dosage_text(copy.deepcopy(dosage), locale)
+    except Exception as e:
+        return f"{type(e).__name__}"
+
+
+def _shrink(dosage: dict, fails: Callable[[dict], bool]) -> dict:
+    # Entfernt so lange einzelne Schlüssel und Listeneinträge, wie die Abweichung bestehen bleibt
+    changed = True
+    while changed:
+        changed = False
+        for path in list(_key_paths(dosage)):
+            candidate = copy.deepcopy(dosage)
+            container = candidate
+            for key in path[:-1]:
+                container = container[key]
+            del container[path[-1]]
+            if fails(candidate):
+                dosage = candidate
+                changed = True
+                break
+    return dosage
+
+
+def _key_paths(value, prefix=()) -> Iterator[tuple]:
+    if isinstance(value, dict):
+        children = value.items()
+    elif isinstance(value, list):
+        children = enumerate(value)
+    else:
+        return
+    for key, child in children:
+        yield from _key_paths(child, prefix + (key,))
+        yield prefix + (key,)
+
+
+def fuzz(candidate, reference=None, iterations: int = 10000, seed: int = 0) -> List[dict]:
+    reference = reference or GematikDosageTextGenerator()
+    rnd = random.Random(seed)
+    failures = []
+    for iteration in range(iterations):
+        dosage = random_dosage(rnd)
+        for locale in SUPPORTED_LOCALES:
+            if _outcome(candidate, dosage, locale) == _outcome(reference, dosage, locale):
+                continue
+
+            def fails(d, locale=locale):
+                return _outcome(candidate, d, locale) != _outcome(reference, d, locale)
+
+            minimal = _shrink(dosage, fails)
+            failures.append({
+                "iteration": iteration,
+                "locale": locale,
+                "dosage": minimal,
+                "expected": _outcome(reference, minimal, locale),
+                "actual": _outcome(candidate, minimal, locale),
+            })
+            break
+    return failures
+
+
+# Kommandozeile
+
+def main(argv: Optional[List[str]] = None) -> int:
+    corpus = argparse.ArgumentParser(add_help=False)
+    corpus.add_argument("--corpus", type=Path, default=CORPUS_FILE, help="Pfad zum Golden-Korpus")
+
+    parser = argparse.ArgumentParser(prog="python -m dosage.conformance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser(
+        "generate", parents=[corpus], help="Golden-Korpus aus der Referenzimplementierung erzeugen"
+    )
+
+    check = commands.add_parser(
+        "check", parents=[corpus], help="Implementierung byte-genau gegen den Korpus prüfen"
+    )
+    check.add_argument("--impl", help="Alternative Implementierung als modul:attribut")
+    check.add_argument("--repeat", type=int, default=1, help="Messwiederholungen je Fall (Minimum zählt)")
+    check.add_argument("--timings", type=Path, help="Laufzeit je Fall als JSON Lines schreiben")
+    check.add_argument("--slowest", type=int, default=10)
+
+    fuzzing = commands.add_parser("fuzz", help="Zufallsdosierungen gegen die Referenz vergleichen")
+    fuzzing.add_argument("--impl", required=True, help="Alternative Implementierung als modul:attribut")
+    fuzzing.add_argument("--iterations", type=int, default=10000)
+    fuzzing.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        corpus = build_corpus()
+        write_corpus(corpus, args.corpus)
+        print(f"{len(corpus)} Fälle nach {args.corpus} geschrieben.")
+        return 0
+
+    if args.command == "check":
+        results = check_corpus(load_corpus(args.corpus), load_implementation(args.impl), args.repeat)
+        if args.timings:
+            with open(args.timings, "w", encoding="utf-8") as file:
+                for result in results:
+                    file.write(json.dumps(
+                        {key: result[key] for key in ("id", "locale", "ok", "ns")}
+                    ) + "\n")
+        failures = [result for result in results if not result["ok"]]
+        for result in failures:
+            print(f"ABWEICHUNG {result['id']} [{result['locale']}]", file=sys.stderr)
+            print(f"  erwartet: {result['expected']!r}", file=sys.stderr)
+            print(f"  erhalten: {result['actual']!r}", file=sys.stderr)
+        total_ns = sum(result["ns"] for result in results)
+        print(f"{len(results) - len(failures)}/{len(results)} Fälle byte-genau, "
+              f"gesamt {total_ns / 1e6:.1f} ms, Mittel {total_ns / max(len(results), 1) / 1e3:.2f} µs")
+        for result in sorted(results, key=lambda r: r["ns"], reverse=True)[:args.slowest]:
+            print(f"  {result['ns'] / 1e3:8.2f} µs  {result['id']} [{result['locale']}]")
+        return 1 if failures else 0
+
+    failures = fuzz(load_implementation(args.impl), iterations=args.iterations, seed=args.seed)
+    for failure in failures:
+        print(json.dumps(failure, ensure_ascii=False), file=sys.stderr)
+    print(f"{args.iterations} Zufallsdosierungen, {len(failures)} Abweichungen.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,78 @@
 # dosage/units.py
 
 from pathlib import Path
+import json
 import re
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+KBV_DOSE_UNIT_SYSTEM = "https://fhir.kbv.de/CodeSystem/KBV_CS_SFHIR_BMP_DOSIEREINHEIT"
+UCUM_SYSTEM = "http://unitsofmeasure.org"
 
 UNITS_FILE = Path(__file__).parent.parent / "templates" / "_dosage_units.jinja"
+UNIT_TRANSLATIONS_FILE = Path(__file__).parent / "dosage_unit_translations.json"
+UNIT_PATTERN = re.compile(r'\("([^"]+)",\s*"([^"]+)"\)')
+
+
+class DosageUnitRegistry:
+    # Unveränderliche Zuordnung Dosiereinheit-Code -> Bezeichnung, dazu die
+    # Übersetzungen je Sprache. Wird nie verändert, sondern beim Neuladen als
+    # Ganzes ersetzt.
+
+    def __init__(self, units: Mapping[str, str], translations: Optional[Mapping[str, Mapping[str, str]]] = None):
+        self.units = MappingProxyType(dict(units))
+        self.translations = MappingProxyType({
+            locale: MappingProxyType(dict(labels)) for locale, labels in (translations or {}).items()
+        })
+        for locale, labels in self.translations.items():
+            missing = [code for code in self.units if code not in labels]
+            if missing:
+                raise ValueError(
+                    f"Für die Sprache '{locale}' fehlen Übersetzungen der Dosiereinheiten: {', '.join(missing)}"
+                )
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def resolve(self, code: Optional[str]) -> str:
+        return self.units.get(code or "", code or "")
+
+    def translate(self, code: str, locale: str) -> Optional[str]:
+        labels = self.translations.get(locale)
+        if labels is None:
+            raise ValueError(f"Für die Sprache '{locale}' sind keine Dosiereinheiten hinterlegt.")
+        return labels.get(code)
+
+
+def get_dosage_unit_mapping(path: Path = UNITS_FILE) -> dict[str, str]:
+    text = path.read_text(encoding="utf-8")
+    return dict(UNIT_PATTERN.findall(text))
+
+def get_dosage_unit_translations(path: Path = UNIT_TRANSLATIONS_FILE) -> dict[str, dict[str, str]]:
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+def load_dosage_unit_registry(
+    path: Path = UNITS_FILE, translations_path: Path = UNIT_TRANSLATIONS_FILE
+) -> DosageUnitRegistry:
+    return DosageUnitRegistry(get_dosage_unit_mapping(path), get_dosage_unit_translations(translations_path))
+
+
+# Aktuell gültige Tabelle. Lesende Zugriffe holen sich die Referenz einmal,
+# das Ersetzen ist eine einzelne Zuweisung und braucht daher keine Sperre.
+_registry: Optional[DosageUnitRegistry] = None
+
+def get_dosage_unit_registry() -> DosageUnitRegistry:
+    global _registry
+    registry = _registry
+    if registry is None:
+        registry = _registry = load_dosage_unit_registry()
+    return registry
 
-def get_dosage_unit_mapping() -> dict[str, str]:
-    text = UNITS_FILE.read_text(encoding="utf-8")
-    pattern = r'\("([^"]+)",\s*"([^"]+)"\)'
-    return dict(re.findall(pattern, text))
+def set_dosage_unit_registry(registry: DosageUnitRegistry) -> DosageUnitRegistry:
+    global _registry
+    previous, _registry = _registry, registry
+    return previous
 
 def resolve_unit_label(code: Optional[str]) -> str:
-    units = get_dosage_unit_mapping()
-    return units.get(code or "", code or "")
+    return get_dosage_unit_registry().resolve(code)
@@ -0,0 +1,284 @@
+# dosage/locales.py
+
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    from dosage.dosage_units import (
+        KBV_DOSE_UNIT_SYSTEM, UCUM_SYSTEM, DosageUnitRegistry, get_dosage_unit_registry
+    )
+except ImportError:  # Aufruf als Skript aus dem Verzeichnis dosage/
+    from dosage_units import (
+        KBV_DOSE_UNIT_SYSTEM, UCUM_SYSTEM, DosageUnitRegistry, get_dosage_unit_registry
+    )
+
+DEFAULT_LOCALE = "de"
+
+
+class ClockTime(NamedTuple):
+    hour: int
+    minute: str
+
+
+# Rohe Phrasenkataloge je Sprache. Deutsche Ressourcen tragen bereits deutsche
+# Einheitenbezeichnungen, daher übersetzt nur en/tr die Einheiten, und zwar nur
+# bei eindeutigem System: KBV-Dosiereinheiten über die DosageUnitRegistry,
+# UCUM-Zeiteinheiten über time_units. Ohne System gilt für alle Sprachen
+# dieselbe Regel (Bezeichnung bzw. Code unverändert), damit alle Sprachen
+# dieselbe Dosis nennen.
+# time_units: (Singular, Plural[, Lokativ für every/per]).
+PHRASES: Dict[str, dict] = {
+    "de": {
+        "name": "Deutsch",
+        "unsupported": "Die Dosiskonfiguration mit den Feldern {fields} wird in der aktuellen Ausbaustufe nicht unterstützt.",
+        "daily": "täglich",
+        "daily_n": "{frequency} x täglich",
+        "weekly": "wöchentlich",
+        "weekly_n": "{frequency} x wöchentlich",
+        "every": "alle {period}",
+        "per": "{frequency} x pro {period}",
+        "period": "{value} {unit}",
+        "bounds": "für {duration}",
+        "dose": "je {quantity}",
+        "times": "um {times}",
+        "time": "{hour:02d}:{minute} Uhr",
+        "separator": ", ",
+        "and": " und ",
+        "time_units": {
+            "s": ("Sekunde", "Sekunden"),
+            "min": ("Minute", "Minuten"),
+            "h": ("Stunde", "Stunden"),
+            "d": ("Tag", "Tage"),
+            "wk": ("Woche", "Wochen"),
+            "mo": ("Monat", "Monate"),
+            "a": ("Jahr", "Jahre"),
+        },
+        "days": {
+            "mon": "Montag",
+            "tue": "Dienstag",
+            "wed": "Mittwoch",
+            "thu": "Donnerstag",
+            "fri": "Freitag",
+            "sat": "Samstag",
+            "sun": "Sonntag",
+        },
+        "when": {
+            "MORN": "morgens",
+            "NOON": "mittags",
+            "EVE": "abends",
+            "NIGHT": "zur nacht",
+        },
+        "translate_units": False,
+    },
+    "en": {
+        "name": "English",
+        "unsupported": "Dosage configurations with the fields {fields} are not supported at the current expansion stage.",
+        "daily": "daily",
+        "daily_n": "{frequency} times daily",
+        "weekly": "weekly",
+        "weekly_n": "{frequency} times weekly",
+        "every": "every {period}",
+        "per": "{frequency} times per {period}",
+        "period": "{value} {unit}",
+        "bounds": "for {duration}",
+        "dose": "{quantity} each",
+        "times": "at {times}",
+        "time": "{hour:02d}:{minute}",
+        "separator": ", ",
+        "and": " and ",
+        "time_units": {
+            "s": ("second", "seconds"),
+            "min": ("minute", "minutes"),
+            "h": ("hour", "hours"),
+            "d": ("day", "days"),
+            "wk": ("week", "weeks"),
+            "mo": ("month", "months"),
+            "a": ("year", "years"),
+        },
+        "days": {
+            "mon": "Monday",
+            "tue": "Tuesday",
+            "wed": "Wednesday",
+            "thu": "Thursday",
+            "fri": "Friday",
+            "sat": "Saturday",
+            "sun": "Sunday",
+        },
+        "when": {
+            "MORN": "in the morning",
+            "NOON": "at noon",
+            "EVE": "in the evening",
+            "NIGHT": "at night",
+        },
+        "translate_units": True,
+    },
+    "tr": {
+        "name": "Türkçe",
+        "unsupported": "{fields} alanlarını içeren doz yapılandırması mevcut sürümde desteklenmemektedir.",
+        "daily": "her gün",
+        "daily_n": "günde {frequency} kez",
+        "weekly": "her hafta",
+        "weekly_n": "haftada {frequency} kez",
+        "every": "{value} {locative} bir",
+        "per": "{value} {locative} {frequency} kez",
+        "period": "{value} {unit}",
+        "bounds": "{duration} boyunca",
+        "dose": "her seferinde {quantity}",
+        "times": "saat {times}",
+        "time": "{hour:02d}:{minute}",
+        "separator": ", ",
+        "and": " ve ",
+        "time_units": {
+            "s": ("saniye", "saniye", "saniyede"),
+            "min": ("dakika", "dakika", "dakikada"),
+            "h": ("saat", "saat", "saatte"),
+            "d": ("gün", "gün", "günde"),
+            "wk": ("hafta", "hafta", "haftada"),
+            "mo": ("ay", "ay", "ayda"),
+            "a": ("yıl", "yıl", "yılda"),
+        },
+        "days": {
+            "mon": "Pazartesi",
+            "tue": "Salı",
+            "wed": "Çarşamba",
+            "thu": "Perşembe",
+            "fri": "Cuma",
+            "sat": "Cumartesi",
+            "sun": "Pazar",
+        },
+        "when": {
+            "MORN": "sabah",
+            "NOON": "öğlen",
+            "EVE": "akşam",
+            "NIGHT": "gece",
+        },
+        "translate_units": True,
+    },
+}
+
+
+class PhraseCatalog:
+    # Beim Laden kompilierte Nachschlagetabellen einer Sprache; rendert
+    # ausschließlich bereits analysierte Werte aus dem Textgenerator.
+
+    def __init__(self, locale: str, phrases: dict):
+        self.locale = locale
+        self.name = phrases["name"]
+        self._unsupported = phrases["unsupported"].format
+        self._daily = phrases["daily"]
+        self._daily_n = phrases["daily_n"].format
+        self._weekly = phrases["weekly"]
+        self._weekly_n = phrases["weekly_n"].format
+        self._every = phrases["every"].format
+        self._per = phrases["per"].format
+        self._period = phrases["period"].format
+        self._bounds = phrases["bounds"].format
+        self._dose = phrases["dose"].format
+        self._times = phrases["times"].format
+        self._time = phrases["time"].format
+        self._separator = phrases["separator"]
+        self._and = phrases["and"]
+        self._singular_units = {code: names[0] for code, names in phrases["time_units"].items()}
+        self._plural_units = {code: names[1] for code, names in phrases["time_units"].items()}
+        self._locative_units = {code: names[-1] for code, names in phrases["time_units"].items()}
+        self._day_names = dict(phrases["days"])
+        self._when_names = dict(phrases["when"])
+        self._translate_units = phrases["translate_units"]
+
+    def unsupported(self, fields: Sequence[str]) -> str:
+        return self._unsupported(fields=", ".join(fields))
+
+    def join(self, names: List[str]) -> str:
+        if not names:
+            return ""
+        if len(names) == 1:
+            return names[0]
+        return f"{self._separator.join(names[:-1])}{self._and}{names[-1]}"
+
+    def frequency(self, frequency, period, period_unit) -> str:
+        if period_unit == 'd' and period == 1:
+            return self._daily if frequency == 1 else self._daily_n(frequency=frequency)
+        if period_unit == 'wk' and period == 1:
+            return self._weekly if frequency == 1 else self._weekly_n(frequency=frequency)
+        period_text = self.period(period, period_unit)
+        locative = self._locative_units.get(period_unit, period_unit)
+        if frequency == 1:
+            return self._every(period=period_text, value=period, locative=locative)
+        return self._per(frequency=frequency, period=period_text, value=period, locative=locative)
+
+    def time_unit(self, value, unit) -> str:
+        if value == 1:
+            return self._singular_units.get(unit, unit)
+        return f"{self._plural_units.get(unit, unit)}"
+
+    def period(self, period, unit) -> str:
+        return self._period(value=period, unit=self.time_unit(period, unit))
+
+    def days(self, days: List[str]) -> str:
+        return self.join([self._day_names.get(day, day) for day in days])
+
+    def time(self, time) -> str:
+        if isinstance(time, ClockTime):
+            return self._time(hour=time.hour, minute=time.minute)
+        return time
+
+    def times(self, times: list) -> str:
+        if not times:
+            return ""
+        return self._times(times=", ".join([self.time(time) for time in times]))
+
+    def when_code(self, when: str) -> str:
+        return self._when_names.get(when.upper(), when)
+
+    def when(self, when_list: List[str]) -> str:
+        return self.join([self.when_code(w) for w in when_list])
+
+    def quantity(self, quantity: dict, label: Optional[str] = None) -> str:
+        value = quantity.get('value', 0)
+        unit = label or quantity.get('unit') or quantity.get('code') or ""
+        return f"{value}{' ' + unit if unit else ''}"
+
+    def _missing_translation(self, code: str) -> ValueError:
+        return ValueError(f"Für die Einheit '{code}' fehlt eine Übersetzung in die Sprache '{self.locale}'.")
+
+    def dose(self, quantity: dict, units: Optional[DosageUnitRegistry] = None) -> str:
+        label = None
+        code = quantity.get('code')
+        if code and quantity.get('system') == KBV_DOSE_UNIT_SYSTEM:
+            registry = units or get_dosage_unit_registry()
+            # Widersprechen sich Bezeichnung und Code, ist die Dosis in keiner
+            # Sprache eindeutig - auch nicht im Deutschen.
+            expected = registry.units.get(code)
+            unit = quantity.get('unit')
+            if unit and expected is not None and unit != expected:
+                raise ValueError(
+                    f"Die Einheit '{unit}' passt nicht zum Dosiereinheit-Code '{code}' ({expected})."
+                )
+            if self._translate_units:
+                label = registry.translate(code, self.locale)
+                if label is None:
+                    raise self._missing_translation(code)
+        return self._dose(quantity=self.quantity(quantity, label))
+
+    def bounds(self, quantity: dict) -> str:
+        label = None
+        code = quantity.get('code')
+        if self._translate_units and code and quantity.get('system') == UCUM_SYSTEM:
+            if code not in self._singular_units:
+                raise self._missing_translation(code)
+            label = self.time_unit(quantity.get('value', 0), code)
+        duration = self.quantity(quantity, label)
+        return self._bounds(duration=duration) if duration else ""
+
+
+CATALOGS: Mapping[str, PhraseCatalog] = MappingProxyType(
+    {locale: PhraseCatalog(locale, phrases) for locale, phrases in PHRASES.items()}
+)
+SUPPORTED_LOCALES: Tuple[str, ...] = tuple(CATALOGS)
+
+
+def get_catalog(locale: Optional[str] = None) -> PhraseCatalog:
+    try:
+        return CATALOGS[locale or DEFAULT_LOCALE]
+    except KeyError:
+        raise ValueError(f"Die Sprache '{locale}' wird nicht unterstützt.") from None
@@ -2,37 +2,94 @@
 import json
 import sys
 import os
+from typing import List, NamedTuple, Optional, Sequence
+
+try:
+    from dosage.locales import ClockTime, get_catalog
+except ImportError:  # Aufruf als Skript aus dem Verzeichnis dosage/
+    from locales import ClockTime, get_catalog
 
 __version__ = "1.0.0"
 
+DENY_DOSAGE_FIELDS = frozenset({
+    "asNeededBoolean", "asNeededCodeableConcept", "method", "route", "site",
+    "additionalInstruction", "maxDosePerPeriod", "maxDosePerAdministration", "maxDosePerLifetime"
+})
+DENY_TIMING_FIELDS = frozenset({"event"})
+DENY_TIMING_REPEAT_FIELDS = frozenset({
+    "count", "countMax", "boundsPeriod", "boundsRange", "offset", "frequencyMax", "periodMax"
+})
+DENY_DOSE_AND_RATE_SUBFIELDS = frozenset({"doseRange", "rateQuantity", "rateRange", "rateRatio"})
+
+DAY_ORDER = {day: idx for idx, day in enumerate(['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun'])}
+WHEN_ORDER = {key: idx for idx, key in enumerate(['MORN', 'NOON', 'AFT', 'EVE', 'NIGHT'])}
+
+
+class DosagePlan(NamedTuple):
+    # Sprachunabhängiges Ergebnis der Analyse einer Dosierung; wird pro Sprache
+    # nur noch formatiert.
+    unsupported: Sequence[str]
+    override: bool = False
+    bounds: Optional[dict] = None
+    frequency: Optional[tuple] = None
+    days: Sequence[str] = ()
+    times: Sequence = ()
+    when: Sequence[str] = ()
+    dose: Optional[dict] = None
+
+
 class GematikDosageTextGenerator:
-    def generate_single_dosage_text(self, dosage):
+    def __init__(self, locale: Optional[str] = None):
+        self.catalog = get_catalog(locale)
+
+    def generate_single_dosage_text(self, dosage, locale=None, units=None):
+        return self.render(self.analyze(dosage), locale, units)
+
+    def generate_localized_texts(self, dosage, locales, units=None):
+        # Eine Analyse, danach je Sprache nur ein Formatierungsdurchlauf
+        plan = self.analyze(dosage)
+        return {locale: self.render(plan, locale, units) for locale in locales}
+
+    def analyze(self, dosage):
         # Nicht unterstützte Felder dürfen nicht angegeben werden
         unsupported_fields = self.get_unsupported_fields(dosage)
         if unsupported_fields:
-            felder = ", ".join(unsupported_fields)
-            return f"Die Dosiskonfiguration mit den Feldern {felder} wird in der aktuellen Ausbaustufe nicht unterstützt."
-        
+            return DosagePlan(unsupported_fields)
+
         # If free-text override is present, return empty string
         if dosage.get('text'):
+            return DosagePlan((), override=True)
+
+        repeat = self._get_repeat(dosage)
+        return DosagePlan(
+            (),
+            # 1. Gesamtdauer der Anwendung
+            bounds=repeat.get('boundsDuration') or None,
+            # 2. Bestimmen des Zeitabschnitts
+            frequency=self._parse_frequency(repeat),
+            # Wochentag
+            days=self._sort_days(repeat.get('dayOfWeek', [])),
+            # 3. Geplante Frequenz innerhalb des Zeitabschnitts (Times of day + When)
+            times=self._parse_times(repeat.get('timeOfDay', [])),
+            when=self._sort_when(repeat.get('when', [])),
+            # 4. Angaben zur Einzeldosis
+            dose=self._get_dose_quantity(dosage),
+        )
+
+    def render(self, plan, locale=None, units=None):
+        catalog = self.catalog if locale is None else get_catalog(locale)
+        if plan.unsupported:
+            return catalog.unsupported(plan.unsupported)
+        if plan.override:
             return ""
 
-        # 1. Gesamtdauer der Anwendung
-        bounds = self.get_bounds(dosage)
-
-        # 2. Bestimmen des Zeitabschnitts
-        frequency = self.get_frequency(dosage)
-        
-        # Wochentag
-        days_of_week = self.get_days_of_week(dosage)
-
-        # 3. Geplante Frequenz innerhalb des Zeitabschnitts (Times of day + When)
-        times_of_day = self.get_times_of_day(dosage)
-        when = self.get_when(dosage)
+        bounds = catalog.bounds(plan.bounds) if plan.bounds else ""
+        frequency = catalog.frequency(*plan.frequency) if plan.frequency else ""
+        days_of_week = catalog.days(plan.days)
+        times_of_day = catalog.times(plan.times)
+        when = catalog.when(plan.when)
         geplante_frequenz = " ".join(filter(None, [times_of_day, when])).strip()
-
-        # 4. Angaben zur Einzeldosis
-        dose = self.get_dose(dosage)
+        dose = catalog.dose(plan.dose, units) if plan.dose else ""
 
         # Zusammenbauen im gewünschten Format
         left = " ".join(filter(None, [bounds, frequency])).strip()
@@ -47,209 +104,130 @@ class GematikDosageTextGenerator:
         else:
             return ""
 
-    
     def get_unsupported_fields(self, dosage):
-        deny_dosage_fields = {
-            "asNeededBoolean", "asNeededCodeableConcept", "method", "route", "site",
-            "additionalInstruction", "maxDosePerPeriod", "maxDosePerAdministration", "maxDosePerLifetime"
-        }
-        deny_timing_fields = {"event"}
-        deny_timing_repeat_fields = {
-            "count", "countMax", "boundsPeriod", "boundsRange", "offset", "frequencyMax", "periodMax"
-        }
-        deny_doseAndRate_subfields = {"doseRange", "rateQuantity", "rateRange", "rateRatio"}
-
         unsupported = set()
         
         # Top-level deny fields
         for key in dosage.keys():
-            if key in deny_dosage_fields:
+            if key in DENY_DOSAGE_FIELDS:
                 unsupported.add(key)
         # doseAndRate subfields
         if "doseAndRate" in dosage:
             for dr in dosage["doseAndRate"]:
                 for subkey in dr.keys():
-                    if subkey in deny_doseAndRate_subfields:
+                    if subkey in DENY_DOSE_AND_RATE_SUBFIELDS:
                         unsupported.add(f"doseAndRate.{subkey}")
         # timing deny fields
         timing = dosage.get('timing', {})
         for key in timing.keys():
-            if key in deny_timing_fields:
+            if key in DENY_TIMING_FIELDS:
                 unsupported.add(f"timing.{key}")
         # timing.repeat deny fields
         repeat = timing.get('repeat', {})
         for key in repeat.keys():
-            if key in deny_timing_repeat_fields:
+            if key in DENY_TIMING_REPEAT_FIELDS:
                 unsupported.add(f"timing.repeat.{key}")
-            
-        return list(unsupported)
+
+        # Sortiert, damit die Meldung unabhängig von der Hash-Reihenfolge ist
+        return sorted(unsupported)
 
     def get_dose(self, dosage):
-        dose_and_rate = dosage.get('doseAndRate', [])
-        if not dose_and_rate:
-            return ""
-        first_dose = dose_and_rate[0]
-        if first_dose.get('doseQuantity'):
-            return self.format_quantity(first_dose['doseQuantity'])
-        return ""
+        quantity = self._get_dose_quantity(dosage)
+        return self.catalog.dose(quantity) if quantity else ""
 
     def get_frequency(self, dosage):
-        timing = dosage.get('timing', {})
-        repeat = timing.get('repeat', {})
-        if not repeat:
-            return ""
-        frequency = repeat.get('frequency')
-        period = repeat.get('period')
-        period_unit = repeat.get('periodUnit')
-        if frequency is None and period is None and period_unit is None:
-            return ""
-        if period_unit == 'd' and period == 1:
-            return "täglich" if frequency == 1 else f"{frequency} x täglich"
-                
-        if period_unit == 'wk' and period == 1:
-            return "wöchentlich" if frequency == 1 else f"{frequency} x wöchentlich"
-                
-        if frequency == 1:
-            period_text = self.format_period_unit(period, period_unit)
-            return f"alle {period_text}"
-        freq_text = f"{frequency} x"
-        period_text = self.format_period_unit(period, period_unit)
-        return f"{freq_text} pro {period_text}"
+        frequency = self._parse_frequency(self._get_repeat(dosage))
+        return self.catalog.frequency(*frequency) if frequency else ""
 
     def get_days_of_week(self, dosage):
-        timing = dosage.get('timing', {})
-        repeat = timing.get('repeat', {})
-        days = repeat.get('dayOfWeek', [])
-        if not days:
-            return ""
-        return self.format_days_of_week(days)
+        return self.catalog.days(self._sort_days(self._get_repeat(dosage).get('dayOfWeek', [])))
 
     def get_times_of_day(self, dosage):
-        timing = dosage.get('timing', {})
-        repeat = timing.get('repeat', {})
-        times = repeat.get('timeOfDay', [])
-        if not times:
-            return ""
-        # Sort the times as strings (works for HH:MM or HH:MM:SS)
-        sorted_times = sorted(times)
-        return "um " + ", ".join([self.format_time(time) for time in sorted_times])
-
+        return self.catalog.times(self._parse_times(self._get_repeat(dosage).get('timeOfDay', [])))
 
     def get_when(self, dosage):
-        timing = dosage.get('timing', {})
-        repeat = timing.get('repeat', {})
-        parts = []
-        when_list = repeat.get('when', [])
-        when_order = ['MORN', 'NOON', 'AFT', 'EVE', 'NIGHT']
-        order_map = {key: idx for idx, key in enumerate(when_order)}
-        when_list_sorted = sorted(when_list, key=lambda w: order_map.get(w, len(when_order)))
-        if when_list_sorted:
-            when_names = [self.translate_when_code(w) for w in when_list_sorted]
-            if len(when_names) == 1:
-                when_text = when_names[0]
-            elif len(when_names) == 2:
-                when_text = f"{when_names[0]} und {when_names[1]}"
-            else:
-                when_text = f"{', '.join(when_names[:-1])} und {when_names[-1]}"
-            parts.append(when_text)
-        return ", ".join(parts)
+        return self.catalog.when(self._sort_when(self._get_repeat(dosage).get('when', [])))
 
     def get_bounds(self, dosage):
-        timing = dosage.get('timing', {})
-        repeat = timing.get('repeat', {})
-        if repeat.get('boundsDuration'):
-            dur = self.format_quantity(repeat['boundsDuration'], with_je=False)
-            return f"für {dur}" if dur else ""
-        return ""
+        bounds = self._get_repeat(dosage).get('boundsDuration')
+        return self.catalog.bounds(bounds) if bounds else ""
 
     def format_quantity(self, quantity, with_je=True):
-        value = quantity.get('value', 0)
-        unit = quantity.get('unit') or quantity.get('code') or ""
-        prefix = "je " if with_je else ""
-        return f"{prefix}{value}{' ' + unit if unit else ''}"
+        return self.catalog.dose(quantity) if with_je else self.catalog.quantity(quantity)
 
     def format_time(self, time):
-        try:
-            parts = time.split(':')
-            hour = int(parts[0])
-            minute = parts[1] if len(parts) > 1 else '00'
-            return f"{hour:02d}:{minute} Uhr"
-        except:
-            return time
+        return self.catalog.time(self._parse_time(time))
 
     def format_time_unit(self, value, unit):
-        units = {
-            's': 'Sekunde',
-            'min': 'Minute',
-            'h': 'Stunde',
-            'd': 'Tag',
-            'wk': 'Woche',
-            'mo': 'Monat',
-            'a': 'Jahr'
-        }
-        multi_units = {
-            's': 'Sekunden',
-            'min': 'Minuten',
-            'h': 'Stunden',
-            'd': 'Tage',
-            'wk': 'Wochen',
-            'mo': 'Monate',
-            'a': 'Jahre'
-        }
-        unit_name = units.get(unit, unit)
-        units_name = multi_units.get(unit, unit)
-        return unit_name if value == 1 else f"{units_name}"
+        return self.catalog.time_unit(value, unit)
 
     def format_period_unit(self, period, unit):
-        unit_text = self.format_time_unit(period, unit)
-        return f"{period} {unit_text}"
+        return self.catalog.period(period, unit)
 
     def format_days_of_week(self, days):
-        day_order = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
-        day_names = {
-            'mon': 'Montag',
-            'tue': 'Dienstag',
-            'wed': 'Mittwoch',
-            'thu': 'Donnerstag',
-            'fri': 'Freitag',
-            'sat': 'Samstag',
-            'sun': 'Sonntag'
-        }
-        # Lowercase all input days for matching
+        return self.catalog.days(self._sort_days(days))
+
+    def translate_when_code(self, when):
+        return self.catalog.when_code(when)
+
+    def _get_repeat(self, dosage):
+        timing = dosage.get('timing', {})
+        return timing.get('repeat', {})
+
+    def _get_dose_quantity(self, dosage):
+        dose_and_rate = dosage.get('doseAndRate', [])
+        if not dose_and_rate:
+            return None
+        return dose_and_rate[0].get('doseQuantity') or None
+
+    def _parse_frequency(self, repeat):
+        if not repeat:
+            return None
+        frequency = repeat.get('frequency')
+        period = repeat.get('period')
+        period_unit = repeat.get('periodUnit')
+        if frequency is None and period is None and period_unit is None:
+            return None
+        return frequency, period, period_unit
+
+    def _sort_days(self, days):
+        if not days:
+            return []
+        # Lowercase all input days and sort by the canonical order
         days_lower = [d.lower() for d in days]
-        # Sort by the canonical order
-        sorted_days = sorted(days_lower, key=lambda d: day_order.index(d) if d in day_order else 99)
-        names = [day_names.get(day, day) for day in sorted_days]
-        if not names:
-            return ""
-        if len(names) == 1:
-            return names[0]
-        if len(names) == 2:
-            return f"{names[0]} und {names[1]}"
-        return f"{', '.join(names[:-1])} und {names[-1]}"
+        return sorted(days_lower, key=lambda d: DAY_ORDER.get(d, 99))
 
+    def _parse_times(self, times):
+        if not times:
+            return []
+        # Sort the times as strings (works for HH:MM or HH:MM:SS)
+        return [self._parse_time(time) for time in sorted(times)]
 
-    def translate_when_code(self, when):
-        when_codes = {
-            'MORN': 'morgens',
-            'NOON': 'mittags',
-            'EVE': 'abends',
-            'NIGHT': 'zur nacht'
-        }
-        return when_codes.get(when.upper(), when)
+    def _parse_time(self, time):
+        try:
+            parts = time.split(':')
+            hour = int(parts[0])
+            minute = parts[1] if len(parts) > 1 else '00'
+            return ClockTime(hour, minute)
+        except Exception:
+            return time
+
+    def _sort_when(self, when_list):
+        return sorted(when_list, key=lambda w: WHEN_ORDER.get(w, len(WHEN_ORDER)))
 
 def main():
     if len(sys.argv) < 2:
-        print('Verwendung: python dosage-generator.py <dosage.json>', file=sys.stderr)
+        print('Verwendung: python dosage-generator.py <dosage.json> [sprache]', file=sys.stderr)
         sys.exit(1)
     file_path = sys.argv[1]
+    locale = sys.argv[2] if len(sys.argv) > 2 else None
     if not os.path.exists(file_path):
         print(f"Fehler: Datei '{file_path}' nicht gefunden.", file=sys.stderr)
         sys.exit(1)
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
             dosage = json.load(file)
-        generator = GematikDosageTextGenerator()
+        generator = GematikDosageTextGenerator(locale)
         result = generator.generate_single_dosage_text(dosage)
         print(result)
     except json.JSONDecodeError as e:
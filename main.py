@@ -1,12 +1,15 @@
-from typing import Optional, List
+from contextlib import asynccontextmanager
+from typing import NamedTuple, Optional, List
 import json
-from fastapi import FastAPI, Request, Query
+import os
+import secrets
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Query
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.exceptions import RequestValidationError
 from fastapi.exception_handlers import request_validation_exception_handler
-from fastapi.responses import HTMLResponse
+from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from fastapi import status
 from starlette.requests import Request as StarletteRequest
@@ -14,32 +17,122 @@ from dosage.builder import (
     build_freetext, build_interval, build_interval_with_times,
     build_mman, build_timeofday, build_weekday, build_weekday_based
 )
+from dosage.dosage_units import (
+    DosageUnitRegistry, get_dosage_unit_registry, load_dosage_unit_registry, set_dosage_unit_registry
+)
+from dosage.locales import CATALOGS, DEFAULT_LOCALE, SUPPORTED_LOCALES
 from dosage.text_generator import GematikDosageTextGenerator
 
-app = FastAPI()
+
+ADMIN_TOKEN_ENV = "DOSAGE_EXPLORER_ADMIN_TOKEN"
+
+
+class AppResources(NamedTuple):
+    # Einmal beim Start erzeugt und zwischen allen Requests geteilt. Die
+    # Einheitentabelle gehört bewusst nicht dazu: einzige Quelle ist
+    # dosage.dosage_units, damit der Austausch eine einzelne Zuweisung bleibt.
+    generator: GematikDosageTextGenerator
+    templates: Jinja2Templates
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    set_dosage_unit_registry(load_dosage_unit_registry())
+    templates = Jinja2Templates(directory="templates")
+    templates.env.globals["locales"] = [(catalog.locale, catalog.name) for catalog in CATALOGS.values()]
+    templates.env.globals["default_locale"] = DEFAULT_LOCALE
+    app.state.resources = AppResources(
+        generator=GematikDosageTextGenerator(),
+        templates=templates,
+    )
+    warm_up(app.state.resources)
+    app.state.ready = True
+    yield
+    app.state.ready = False
+
+app = FastAPI(lifespan=lifespan)
 app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+
+async def get_resources(request: Request) -> AppResources:
+    return request.app.state.resources
+
+async def get_units() -> DosageUnitRegistry:
+    # Einmal je Request gelesen und an Builder und Generator weitergereicht,
+    # damit ein Request auch während eines Austauschs nur eine Tabelle sieht.
+    return get_dosage_unit_registry()
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+    expected = os.environ.get(ADMIN_TOKEN_ENV)
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ungültiges Admin-Token.")
+
+def warm_up(resources: AppResources):
+    for name in ("index.html", "form_fragment.html", "_dosage_units.jinja"):
+        resources.templates.get_template(name)
+    units = get_dosage_unit_registry()
+    fhir = build_mman((1, "1"), (0, None), (1, "1"), (0, None), 5, "Arzneimittel", "d", registry=units)
+    for locale in SUPPORTED_LOCALES:
+        generate_dosage_texts(fhir, resources.generator, units, locale)
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: StarletteRequest, exc: RequestValidationError):
     first_error = exc.errors()[0]
     error_message = f"❌ {first_error.get('msg')}"
     schema = request.query_params.get("schema", "freetext")
-    return templates.TemplateResponse("index.html", {
+    return request.app.state.resources.templates.TemplateResponse("index.html", {
         "request": request,
         "schema": schema,
         "fhir": None,
         "text": error_message,
     }, status_code=status.HTTP_400_BAD_REQUEST)
 
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse({"status": "starting"}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return {"status": "ready", "dosage_units": len(get_dosage_unit_registry())}
+
+@app.post("/admin/reload-units", dependencies=[Depends(require_admin_token)])
+def reload_units():
+    try:
+        units = load_dosage_unit_registry()
+    # In beiden Fällen bleibt die bisherige Tabelle aktiv
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except OSError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Die Dosiereinheiten konnten nicht gelesen werden: {e.strerror or e}",
+        )
+    # Austausch ohne Sperre: laufende Requests behalten ihre bereits gelesene
+    # Referenz, neue Requests sehen die neue Tabelle.
+    previous = set_dosage_unit_registry(units)
+    return {"status": "reloaded", "dosage_units": len(units), "previous_dosage_units": len(previous or ())}
+
 @app.get("/", response_class=HTMLResponse)
-async def get_index(request: Request, schema: str = Query(default="freetext")):
-    return templates.TemplateResponse("index.html", {"request": request, "schema": schema})
+async def get_index(
+    request: Request,
+    schema: str = Query(default="freetext"),
+    resources: AppResources = Depends(get_resources),
+):
+    return resources.templates.TemplateResponse("index.html", {"request": request, "schema": schema})
 
 @app.get("/generate/freetext", response_class=HTMLResponse)
-async def generate_freetext(request: Request, freetext: str):
+async def generate_freetext(
+    request: Request,
+    freetext: str,
+    resources: AppResources = Depends(get_resources),
+    units: DosageUnitRegistry = Depends(get_units),
+):
     fhir_dict = build_freetext(freetext)
-    return render_result(request, fhir_dict, schema="freetext")
+    return render_result(request, resources, units, fhir_dict, schema="freetext")
 
 @app.get("/generate/mman", response_class=HTMLResponse)
 async def generate_mman(
@@ -55,6 +148,8 @@ async def generate_mman(
     medication: str = "Arzneimittel",
     duration_value: Optional[str] = Query(default=None),
     duration_unit: Optional[str] = None,
+    resources: AppResources = Depends(get_resources),
+    units: DosageUnitRegistry = Depends(get_units),
 ):
     def safe_int(value):
         try:
@@ -70,9 +165,10 @@ async def generate_mman(
         (safe_int(night), unit_night),
         duration,
         medication,
-        duration_unit
+        duration_unit,
+        registry=units,
     )
-    return render_result(request, fhir_dict, schema="mman")
+    return render_result(request, resources, units, fhir_dict, schema="mman")
 
 @app.get("/generate/timeofday", response_class=HTMLResponse)
 async def generate_timeofday(
@@ -83,16 +179,18 @@ async def generate_timeofday(
     medication: str = "Arzneimittel",
     duration_value: Optional[str] = Query(default=None),
     duration_unit: Optional[str] = None,
+    resources: AppResources = Depends(get_resources),
+    units: DosageUnitRegistry = Depends(get_units),
 ):
     if len(time) != len(set(time)):
-        return render_error(request, "❌ Doppelte Uhrzeiten sind nicht erlaubt.", schema="timeofday")
+        return render_error(request, resources, "❌ Doppelte Uhrzeiten sind nicht erlaubt.", schema="timeofday")
 
     if not (len(time) == len(dose) == len(unit)):
-        return render_error(request, "❌ Uhrzeiten, Dosen und Einheiten müssen jeweils gleich viele Einträge enthalten.", schema="timeofday")
+        return render_error(request, resources, "❌ Uhrzeiten, Dosen und Einheiten müssen jeweils gleich viele Einträge enthalten.", schema="timeofday")
 
     duration = int(duration_value) if duration_value and duration_value.isdigit() else None
-    fhir_dict = build_timeofday(time, dose, unit, duration, medication, duration_unit)
-    return render_result(request, fhir_dict, schema="timeofday")
+    fhir_dict = build_timeofday(time, dose, unit, duration, medication, duration_unit, registry=units)
+    return render_result(request, resources, units, fhir_dict, schema="timeofday")
 
 @app.get("/generate/weekday", response_class=HTMLResponse)
 async def generate_weekday(
@@ -114,6 +212,8 @@ async def generate_weekday(
     medication: str = "Arzneimittel",
     duration_value: Optional[str] = Query(default=None),
     duration_unit: Optional[str] = None,
+    resources: AppResources = Depends(get_resources),
+    units: DosageUnitRegistry = Depends(get_units),
 ):
     days = [
         ("mon", dose_mon, unit_mon),
@@ -127,11 +227,11 @@ async def generate_weekday(
     days_and_doses = [(d, v, u) for d, v, u in days if v is not None]
 
     if not days_and_doses:
-        return render_error(request, "❌ Bitte geben Sie mindestens für einen Wochentag eine Dosis ein.", schema="weekday")
+        return render_error(request, resources, "❌ Bitte geben Sie mindestens für einen Wochentag eine Dosis ein.", schema="weekday")
 
     duration = int(duration_value) if duration_value and duration_value.isdigit() else None
-    fhir_dict = build_weekday(days_and_doses, duration, duration_unit, medication)
-    return render_result(request, fhir_dict, schema="weekday")
+    fhir_dict = build_weekday(days_and_doses, duration, duration_unit, medication, registry=units)
+    return render_result(request, resources, units, fhir_dict, schema="weekday")
 
 @app.get("/generate/interval", response_class=HTMLResponse)
 async def generate_interval(
@@ -140,36 +240,45 @@ async def generate_interval(
     period: int,
     period_unit: str,
     dose: float = 1,
-    unit: str = "Stück",
+    unit: str = "1",
     medication: str = "Arzneimittel",
     duration_value: Optional[str] = Query(default=None),
     duration_unit: Optional[str] = None,
+    resources: AppResources = Depends(get_resources),
+    units: DosageUnitRegistry = Depends(get_units),
 ):
     duration = int(duration_value) if duration_value and duration_value.isdigit() else None
-    fhir_dict = build_interval(frequency, period, period_unit, duration, duration_unit, medication, dose, unit)
-    return render_result(request, fhir_dict, schema="interval")
+    fhir_dict = build_interval(frequency, period, period_unit, duration, duration_unit, medication, dose, unit, registry=units)
+    return render_result(request, resources, units, fhir_dict, schema="interval")
 
 # Helper functions
 
-def render_result(request: Request, fhir: dict, schema: str):
+def render_result(request: Request, resources: AppResources, units: DosageUnitRegistry, fhir: dict, schema: str):
+    locale = request.query_params.get("locale")
+    if locale and locale not in SUPPORTED_LOCALES:
+        return render_error(request, resources, f"❌ Die Sprache '{locale}' wird nicht unterstützt.", schema=schema)
+    try:
+        text = generate_dosage_texts(fhir, resources.generator, units, locale)
+    except ValueError as e:
+        return render_error(request, resources, f"❌ {e}", schema=schema)
     fhir_json = json.dumps(fhir, indent=2, ensure_ascii=False)
-    text = generate_dosage_texts(fhir)
-    return templates.TemplateResponse("index.html", {
+    return resources.templates.TemplateResponse("index.html", {
         "request": request,
         "fhir": fhir_json,
         "text": text,
         "schema": schema
     })
 
-def render_error(request: Request, message: str, schema: str):
-    return templates.TemplateResponse("index.html", {
+def render_error(request: Request, resources: AppResources, message: str, schema: str):
+    return resources.templates.TemplateResponse("index.html", {
         "request": request,
         "fhir": None,
         "text": message,
         "schema": schema
     })
 
-def generate_dosage_texts(fhir: dict) -> str:
-    generator = GematikDosageTextGenerator()
-    texts = [generator.generate_single_dosage_text(d) for d in fhir.get("dosageInstruction", [])]
+def generate_dosage_texts(
+    fhir: dict, generator: GematikDosageTextGenerator, units: DosageUnitRegistry, locale: Optional[str] = None
+) -> str:
+    texts = [generator.generate_single_dosage_text(d, locale, units) for d in fhir.get("dosageInstruction", [])]
     return "<br>".join(filter(None, texts))
\ No newline at end of file